@@ -0,0 +1,173 @@
+from typing import Any, Dict
+import io
+import os
+import copy
+from concurrent.futures import ThreadPoolExecutor
+
+import tensorflow as tf
+from tensorflow.keras.callbacks import ModelCheckpoint
+
+from quickstats.core.modules import get_module_version
+
+from aliad.interface.tensorflow.callbacks import WeightsLogger
+
+def _get_hdf5_format():
+    try:
+        from keras.src.saving.legacy import hdf5_format
+    except ImportError:
+        try:
+            from keras.saving.legacy import hdf5_format
+        except ImportError:
+            return None
+    return hdf5_format
+
+def _write_file(filepath: str, data: bytes) -> None:
+    dirname = os.path.dirname(filepath)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    with open(filepath, 'wb') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+
+class BufferedModelCheckpoint(ModelCheckpoint):
+    """
+    Model checkpoint callback which serializes the model weights into an
+    in-memory buffer and writes the buffer to disk from a background thread.
+
+    Only HDF5 weight checkpoints saved at every period (i.e. without
+    "save_best_only") are buffered; all other configurations behave as
+    the standard ModelCheckpoint.
+
+    The buffered path follows ModelCheckpoint._save_model of Keras 2.15
+    (including the verbose message and the removal of the temporary
+    checkpoint of non-chief workers) and serializes the weights with the
+    legacy HDF5 saving utilities of Keras 2. If these are not available,
+    the standard ModelCheckpoint is used instead.
+    """
+
+    def __init__(self, filepath, *args, **kwargs):
+        super().__init__(filepath, *args, **kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = None
+
+    def _is_buffered(self) -> bool:
+        return (self.save_weights_only and (not self.save_best_only) and
+                str(self.filepath).endswith('.h5') and
+                (get_module_version('keras') < (3, 0, 0)) and
+                (_get_hdf5_format() is not None))
+
+    def _save_model(self, epoch, batch, logs):
+        if not self._is_buffered():
+            return super()._save_model(epoch, batch, logs)
+        if not (isinstance(self.save_freq, int) or (self.epochs_since_last_save >= self.period)):
+            return
+        import h5py
+        self.epochs_since_last_save = 0
+        # keep at most one pending write so that checkpoints are written in order
+        # (and the write path of the pending checkpoint is not overwritten)
+        self.flush()
+        filepath = self._get_file_path(epoch, batch, logs or {})
+        if self.verbose > 0:
+            print(f"\nEpoch {epoch + 1}: saving model to {filepath}")
+        buffer = io.BytesIO()
+        with h5py.File(buffer, 'w') as file:
+            _get_hdf5_format().save_weights_to_hdf5_group(file, self.model)
+        self._pending = self._executor.submit(self._write_checkpoint, filepath, buffer.getvalue())
+
+    def _write_checkpoint(self, filepath: str, data: bytes) -> None:
+        _write_file(filepath, data)
+        # remove the temporary checkpoint of non-chief workers, as in ModelCheckpoint
+        if hasattr(self, '_maybe_remove_file'):
+            self._maybe_remove_file()
+
+    def flush(self) -> None:
+        """Wait until the pending checkpoint is written to disk."""
+        if self._pending is not None:
+            self._pending.result()
+            self._pending = None
+
+    def on_train_end(self, logs=None):
+        self.flush()
+        super().on_train_end(logs)
+
+def _copy_logs(value: Any) -> Any:
+    # copy the log containers (not the logged values) so that the logs can be
+    # written while the training continues to update them
+    if isinstance(value, dict):
+        copied = copy.copy(value)
+        for key, item in value.items():
+            copied[key] = _copy_logs(item)
+        return copied
+    if isinstance(value, list):
+        return [_copy_logs(item) for item in value]
+    return value
+
+class BufferedWeightsLogger(WeightsLogger):
+    """
+    Weights logger which reads all trainable weights with a single device
+    to host transfer and writes the accumulated logs from a background thread.
+
+    The logs are kept in memory until they are saved according to the save
+    frequency (e.g. every N batches or at the end of each epoch), at which
+    point a snapshot of the logger is handed over to the writer thread, which
+    saves the logs with the aliad implementation.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = []
+        self._read_weights = None
+
+    def on_train_begin(self, logs=None):
+        super().on_train_begin(logs=logs)
+        weights = list(self.model.trainable_weights)
+        if weights and all(weight.shape == weights[0].shape for weight in weights):
+            self._read_weights = tf.function(lambda: tf.stack(weights))
+        else:
+            self._read_weights = None
+
+    def get_log_data(self, logs=None) -> Dict[str, Any]:
+        if self._read_weights is None:
+            return super().get_log_data(logs)
+        return {'weights': self._read_weights().numpy()}
+
+    def _save_logs(self, *args, **kwargs) -> None:
+        # The logs are saved by the aliad implementation on a snapshot of the logger,
+        # so that no assumption is made on how the logs are stored (which differs
+        # between aliad versions, e.g. 0.2.1 passes the logs as arguments while
+        # 0.2.3 keeps them in the logger state).
+        snapshot = copy.copy(self)
+        for name, value in vars(self).items():
+            if isinstance(value, (dict, list)) and (name != '_pending'):
+                setattr(snapshot, name, _copy_logs(value))
+        args = _copy_logs(list(args))
+        kwargs = _copy_logs(kwargs)
+        save_logs = super(BufferedWeightsLogger, snapshot)._save_logs
+        self._pending.append(self._executor.submit(save_logs, *args, **kwargs))
+
+    def flush(self) -> None:
+        """Wait until all pending logs are written to disk."""
+        for future in self._pending:
+            future.result()
+        self._pending = []
+
+    def on_epoch_end(self, epoch, logs=None) -> None:
+        super().on_epoch_end(epoch, logs=logs)
+        # drop finished writes (raising their errors, if any)
+        pending = []
+        for future in self._pending:
+            if future.done():
+                future.result()
+            else:
+                pending.append(future)
+        self._pending = pending
+
+    def on_train_end(self, logs=None) -> None:
+        super().on_train_end(logs=logs)
+        self.flush()
+
+    def restore(self):
+        self.flush()
+        super().restore()
@@ -341,10 +341,8 @@ def get_nll(
     poisson_seed = None,
     epsilon: float = 1e-10
 ):
-    if llr_3 is None:
-        llr_xs = 1. + mu * (llr_2 - 1.)
-    else:
-        llr_xs = 1. + mu * (alpha * llr_3 + (1 - alpha) * llr_2 - 1.)
+    from paws.components._semiweakly_numeric import llr_xs_np
+    llr_xs = llr_xs_np(llr_2, mu, alpha=alpha, llr_3=llr_3)
     llr_xs = np.clip(llr_xs, epsilon, np.inf)
     axis = 1 if vectorize else None
     if poisson_seed is not None:
@@ -383,8 +381,6 @@ def run_likelihood_scan(
         alpha_grid = alpha_grid.reshape(-1, 1)
         results['alpha'] = []
 
-    llr_2_all = None
-    llr_3_all = None
     y_true_all = None
     
     nbatch = get_nbatch(mu_grid.shape[0], batchsize)
@@ -393,9 +389,8 @@ def run_likelihood_scan(
         print(f'Batch {i+1} / {nbatch}')
         mu_sub = mu_grid[i * batchsize : (i + 1) * batchsize]
         alpha_sub = None if llr_3 is None else alpha_grid[i * batchsize : (i + 1) * batchsize]
-        if (llr_2_all is None) or (llr_2_all.shape[0] != mu_sub.shape[0]):
-            llr_2_all = np.tile(llr_2, (mu_sub.shape[0], 1))
-            llr_3_all = None if llr_3 is None else np.tile(llr_3, (mu_sub.shape[0], 1))
+        # the likelihood ratios are broadcast against the (batchsize, 1) parameter grid
+        if (y_true_all is None) or (y_true_all.shape[0] != mu_sub.shape[0]):
             y_true_all = np.tile(y_true, (mu_sub.shape[0], 1))
         for poisson_seed in poisson_seeds:
             print(f'Running on seed: {poisson_seed}')
@@ -403,8 +398,8 @@ def run_likelihood_scan(
                 mu=mu_sub,
                 alpha=alpha_sub,
                 y_true=y_true_all,
-                llr_2=llr_2_all,
-                llr_3=llr_3_all,
+                llr_2=llr_2,
+                llr_3=llr_3,
                 vectorize=True,
                 poisson_seed=poisson_seed
             )
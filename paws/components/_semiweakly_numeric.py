@@ -0,0 +1,133 @@
+"""
+Numpy implementations of the semi-weakly layers for evaluating them outside
+of a tensorflow graph (e.g. when scanning over the signal parameters).
+
+The functions are compiled with numba when it is available, otherwise the
+plain (vectorized) numpy versions are used.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+def _jit(fn):
+    if njit is None:
+        return fn
+    return njit(cache=True, fastmath=True, parallel=True)(fn)
+
+@_jit
+def _ws_one_signal_np(fs_out, mu, kappa, epsilon, bug_fix):
+    LLR = kappa * fs_out / (1. - fs_out + epsilon)
+    LLR_xs = 1. + mu * (LLR - 1.)
+    if bug_fix:
+        return LLR_xs / (LLR_xs + 1. - mu)
+    return LLR_xs / (LLR_xs + 1.)
+
+@_jit
+def _ws_two_signal_np(fs_2_out, fs_3_out, mu, alpha, kappa_2, kappa_3, epsilon, bug_fix):
+    LLR_2 = kappa_2 * fs_2_out / (1. - fs_2_out + epsilon)
+    LLR_3 = kappa_3 * fs_3_out / (1. - fs_3_out + epsilon)
+    LLR_xs = 1. + mu * (alpha * LLR_3 + (1. - alpha) * LLR_2 - 1.)
+    if bug_fix:
+        return LLR_xs / (LLR_xs + 1. - mu)
+    return LLR_xs / (LLR_xs + 1.)
+
+@_jit
+def _likelihood_one_signal_np(fs_out, mu, kappa, epsilon):
+    LLR = kappa * fs_out / (1. - fs_out + epsilon)
+    return 1. + mu * (LLR - 1.)
+
+@_jit
+def _likelihood_two_signal_np(fs_2_out, fs_3_out, mu, alpha, kappa_2, kappa_3, epsilon):
+    LLR_2 = kappa_2 * fs_2_out / (1. - fs_2_out + epsilon)
+    LLR_3 = kappa_3 * fs_3_out / (1. - fs_3_out + epsilon)
+    return 1. + mu * (alpha * LLR_3 + (1. - alpha) * LLR_2 - 1.)
+
+@_jit
+def _llr_xs_one_signal_np(llr, mu):
+    return 1. + mu * (llr - 1.)
+
+@_jit
+def _llr_xs_two_signal_np(llr_2, llr_3, mu, alpha):
+    return 1. + mu * (alpha * llr_3 + (1. - alpha) * llr_2 - 1.)
+
+def _as_operand(x):
+    # keep scalars as python floats so that they broadcast in the compiled kernels
+    if np.ndim(x) == 0:
+        return float(x)
+    return np.asarray(x, dtype=np.float64)
+
+def _as_operands(*values):
+    """
+    Convert the kernel operands: scalars become python floats while arrays
+    are expanded to a common shape (e.g. a (N, 1) grid of signal parameters
+    against (N, M) network outputs) as C-contiguous arrays, so that the
+    kernels are compiled once for all calls with the same dimensions.
+    """
+    operands = [_as_operand(value) for value in values]
+    arrays = [operand for operand in operands if isinstance(operand, np.ndarray)]
+    if not arrays:
+        return operands
+    shape = np.broadcast_shapes(*(array.shape for array in arrays))
+    expanded = []
+    for operand in operands:
+        if isinstance(operand, np.ndarray):
+            if operand.shape != shape:
+                # copy of the broadcast view (which is read-only)
+                operand = np.broadcast_to(operand, shape)
+            operand = np.ascontiguousarray(operand)
+        expanded.append(operand)
+    return expanded
+
+def ws_one_signal_np(fs_out, mu, kappa=1., epsilon=1e-10, bug_fix=True):
+    return _ws_one_signal_np(*_as_operands(fs_out, mu, kappa), float(epsilon), bool(bug_fix))
+
+def ws_two_signal_np(fs_2_out, fs_3_out, mu, alpha, kappa_2=1., kappa_3=1.,
+                     epsilon=1e-10, bug_fix=True):
+    return _ws_two_signal_np(*_as_operands(fs_2_out, fs_3_out, mu, alpha, kappa_2, kappa_3),
+                             float(epsilon), bool(bug_fix))
+
+def likelihood_one_signal_np(fs_out, mu, kappa=1., epsilon=1e-10):
+    return _likelihood_one_signal_np(*_as_operands(fs_out, mu, kappa), float(epsilon))
+
+def likelihood_two_signal_np(fs_2_out, fs_3_out, mu, alpha, kappa_2=1., kappa_3=1., epsilon=1e-10):
+    return _likelihood_two_signal_np(*_as_operands(fs_2_out, fs_3_out, mu, alpha, kappa_2, kappa_3),
+                                     float(epsilon))
+
+def llr_xs_np(llr_2, mu, alpha=None, llr_3=None):
+    """
+    Evaluate the likelihood ratio of the signal plus background mixture from
+    the precomputed signal likelihood ratios. The signal parameters can be
+    arrays (e.g. when scanning over mu and alpha).
+    """
+    if llr_3 is None:
+        return _llr_xs_one_signal_np(*_as_operands(llr_2, mu))
+    return _llr_xs_two_signal_np(*_as_operands(llr_2, llr_3, mu, alpha))
+
+def warmup():
+    """
+    Compile the numba kernels for the common operand types (no-op without numba).
+
+    The kernels are only compiled, not executed: the default threading layer of
+    numba is not thread-safe, so the parallel kernels must not be launched from
+    a background thread while the main thread might run them as well.
+    """
+    if njit is None:
+        return
+    from numba import types
+    # network outputs evaluated with scalar parameters
+    array = types.Array(types.float64, 2, 'C')
+    scalar, flag = types.float64, types.boolean
+    for kernel, signature in [
+        (_ws_one_signal_np, (array, scalar, scalar, scalar, flag)),
+        (_ws_two_signal_np, (array, array, scalar, scalar, scalar, scalar, scalar, flag)),
+        (_likelihood_one_signal_np, (array, scalar, scalar, scalar)),
+        (_likelihood_two_signal_np, (array, array, scalar, scalar, scalar, scalar, scalar))
+    ]:
+        kernel.compile(signature)
+    # likelihood ratios expanded against a grid of parameters (as in likelihood scans)
+    _llr_xs_one_signal_np.compile((array, array))
+    _llr_xs_two_signal_np.compile((array, array, array, array))
@@ -1,13 +1,17 @@
 from typing import Optional, Dict, List, Union, Tuple, Any
 from numbers import Number
 import os
+import sys
 import json
+import functools
+import importlib
+import threading
+import weakref
 
 import numpy as np
 
 from quickstats import semistaticmethod
 from quickstats.core.modules import get_module_version
-from quickstats.utils.string_utils import split_str
 
 from aliad.components.callbacks import LoggerSaveMode
 
@@ -15,7 +19,8 @@ from paws.settings import (
     FeatureLevel, HIGH_LEVEL, LOW_LEVEL, TRAIN_FEATURES, ModelType, SEMI_WEAKLY, IDEAL_WEAKLY,
     MLP_LAYERS, INIT_MU, INIT_ALPHA, INIT_KAPPA,
     DEFAULT_FEATURE_LEVEL, DEFAULT_DECAY_MODE, DEFAULT_OUTDIR,
-    MASS_RANGE, MASS_SCALE, PRIOR_RATIO, PRIOR_RATIO_NET_LAYERS
+    MASS_RANGE, MASS_SCALE, PRIOR_RATIO, PRIOR_RATIO_NET_LAYERS,
+    SEMI_WEAKLY_PARAMETERS
 )
 from paws.utils import (
     get_parameter_transform,
@@ -23,15 +28,139 @@ from paws.utils import (
 )
 from .base_loader import BaseLoader
 
+_TF = None
+
+def _tf():
+    """Import tensorflow on first use and return the cached module afterwards."""
+    global _TF
+    if _TF is None:
+        import tensorflow as tf
+        _TF = tf
+    return _TF
+
+@functools.lru_cache(maxsize=None)
+def _lazy_import(module: str, name: str):
+    """Import an object from a module on first use and cache the result."""
+    return getattr(importlib.import_module(module), name)
+
 def assign_weight(weight: "tf.Variable", value: Any):
     from aliad.interface.tensorflow import utils
     utils.assign_weight(weight, value)
 
+def _assign_fast(weight: "tf.Variable", value: Any):
+    """Assign a value to a weight without reading back the updated value."""
+    tf = _tf()
+    if isinstance(weight, tf.Variable):
+        weight.assign(tf.convert_to_tensor(value, dtype=weight.dtype), read_value=False)
+    else:
+        # keras 3 variables do not support the read_value argument
+        weight.assign(value)
+
+def batch_assign_weights(pairs: List[Tuple["tf.Variable", Any]]):
+    """Assign values to multiple weights in one batch."""
+    pairs = [(weight, np.reshape(value, weight.shape)) for weight, value in pairs]
+    if not pairs:
+        return
+    if (get_module_version('keras') > (3, 0, 0)) or _tf().executing_eagerly():
+        for weight, value in pairs:
+            _assign_fast(weight, value)
+    else:
+        _tf().keras.backend.batch_set_value(pairs)
+
+def cast_float32(x: Any):
+    """Cast a (symbolic) tensor to float32 if it is in a different precision."""
+    if isinstance(x, Number):
+        return x
+    tf = _tf()
+    if tf.as_dtype(x.dtype) == tf.float32:
+        return x
+    if get_module_version('keras') > (3, 0, 0):
+        from keras.ops import cast
+    else:
+        cast = tf.cast
+    return cast(x, 'float32')
+
+@functools.lru_cache(maxsize=16)
+def _cached_transform(parameter: str):
+    return get_parameter_transform(parameter)
+
+@functools.lru_cache(maxsize=16)
+def _cached_regularizer(parameter: str, use_regularizer: bool = True):
+    return get_parameter_regularizer(parameter) if use_regularizer else None
+
+# registry of the optimizer classes, resolved on first use
+_OPTIMIZERS = {'Adam': None, 'SGD': None, 'RMSprop': None}
+
+def _optimizer_cls(name: str):
+    optimizer_cls = _OPTIMIZERS.get(name, None)
+    if optimizer_cls is None:
+        optimizer_cls = getattr(_tf().keras.optimizers, name)
+        _OPTIMIZERS[name] = optimizer_cls
+    return optimizer_cls
+
+# optimizers whose state (iterations and slot variables) is initialized with zeros
+_ZERO_STATE_OPTIMIZERS = {'Adam', 'SGD', 'RMSprop'}
+
+# compile configuration of the models compiled by the loader: model -> serialized configuration
+_COMPILED_CONFIGS = weakref.WeakKeyDictionary()
+
+def _serialize_compile_config(config: Dict) -> str:
+    def serialize(obj):
+        # loss and metric objects
+        if hasattr(obj, 'get_config'):
+            return [type(obj).__name__, obj.get_config()]
+        return str(obj)
+    keys = ['loss', 'optimizer', 'optimizer_config', 'metrics', 'jit_compile', 'steps_per_execution']
+    return json.dumps({key: config.get(key, None) for key in keys}, sort_keys=True, default=serialize)
+
+# pre-indexed weight slots of the semi-weakly models: model -> (names, weights, parameter slots);
+# kept outside of the models so that keras does not track the variables a second time
+_SW_WEIGHT_SLOTS = weakref.WeakKeyDictionary()
+
+# cached readers of the semi-weakly model weights: model -> (tf.function, offsets)
+_SW_WEIGHT_READERS = weakref.WeakKeyDictionary()
+
+# sub-models exposed by the loader when building a semi-weakly model
+_SW_AUXILIARY_MODELS = ['semi_weakly_weight_models', 'llr_model', 'fs_model',
+                        'llr_2_model', 'llr_3_model', 'fs_2_model', 'fs_3_model']
+
+# kappa values which are evaluated from a prior ratio network
+_KAPPA_SPECIAL = {'inferred', 'sampled'}
+
+def _get_dtype_clone_function(dtype_policy: str, output_names: List[str]):
+    """Get a clone function for `clone_model` which overrides the dtype policy of the layers."""
+    output_names = set(output_names)
+
+    def clone_function(layer):
+        if isinstance(layer, _tf().keras.Model):
+            # nested models are cloned recursively; only the outputs of the full model stay in float32
+            nested_output_names = layer.output_names if layer.name in output_names else []
+            nested_clone_function = _get_dtype_clone_function(dtype_policy, nested_output_names)
+            return _tf().keras.models.clone_model(layer, clone_function=nested_clone_function)
+        config = layer.get_config()
+        if ('dtype' in config) and (layer.name not in output_names):
+            config['dtype'] = dtype_policy
+        return layer.__class__.from_config(config)
+
+    return clone_function
+
+@functools.lru_cache(maxsize=32)
+def _load_model_cached(model_path: str, mtime: float) -> "keras.Model":
+    # mtime is part of the cache key so that overwritten models are reloaded
+    return ModelLoader.load_model(model_path, inference_only=True)
+
 class ModelLoader(BaseLoader):
     """
     Class for managing the loading and configuration of models.
+
+    Models compiled via `compile_model` use XLA when the "jit_compile" option
+    of the train configuration is enabled (by default for semi-weakly models).
+    XLA auto-clustering can alternatively be enabled for all tensorflow graphs
+    with the environment variable TF_XLA_FLAGS=--tf_xla_auto_jit=2.
     """
 
+    _DOWNCAST_MAP = {'float64': 'float32'}
+
     def __init__(self, feature_level: str = DEFAULT_FEATURE_LEVEL,
                  decay_modes: List[str] = DEFAULT_DECAY_MODE,
                  variables: Optional[str] = None,
@@ -40,6 +169,9 @@ class ModelLoader(BaseLoader):
                  loss: str = 'bce',
                  use_validation: bool = True,
                  distribute_strategy = None,
+                 jit_compile: Optional[bool] = None,
+                 precision: str = 'float32',
+                 warm_jit: bool = True,
                  outdir: str = DEFAULT_OUTDIR,                 
                  verbosity: str = 'INFO',
                  **kwargs):
@@ -69,6 +201,21 @@ class ModelLoader(BaseLoader):
             that nll loss is only allowed for semi-weakly models.
         distribute_strategy : tf.distribute.Strategy
             Strategy used for distributed (multi-GPU) training.
+        jit_compile : bool, optional
+            Whether to compile the models with XLA. If None, the value of
+            the environment variable "PAWS_JIT" (e.g. "1" or "0") is used if
+            set, otherwise XLA is enabled for semi-weakly models only. XLA is
+            never used when the Keras float type is float64.
+        precision : str, default "float32"
+            Numerical precision of the models. Choose between "float32" and
+            "mixed_bf16". With "mixed_bf16", the global Keras policy is set to
+            "mixed_bfloat16" (and restored to "float32" by a later loader
+            with "float32" precision), the loaded prior networks are cloned
+            with the mixed policy, while the output layers, the semi-weakly
+            parameters and the semi-weakly layers are kept in float32.
+        warm_jit : bool, default True
+            Whether to compile (without running) the numba versions of the
+            semi-weakly layers in a background thread during initialization.
         verbosity : str, default "INFO"
             Verbosity level ("DEBUG", "INFO", "WARNING" or "ERROR").
         """
@@ -83,6 +230,20 @@ class ModelLoader(BaseLoader):
                          **kwargs)
         self._loss = loss
         self._sigmoid_activation = sigmoid_activation
+        self.jit_compile = jit_compile
+        self.precision = precision
+        self._checkpoint_basenames = {}
+        self._sw_model_cache = {}
+        # callbacks are created in this order
+        self._callback_builders = {
+            'early_stopping': self._get_early_stopping_callback,
+            'model_checkpoint': self._get_model_checkpoint_callback,
+            'metrics_logger': self._get_metrics_logger_callback,
+            'lr_scheduler': self._get_lr_scheduler_callback,
+            'weights_logger': self._get_weights_logger_callback
+        }
+        if warm_jit:
+            threading.Thread(target=self._warm_jit, daemon=True).start()
 
     @property
     def loss(self) -> str:
@@ -96,8 +257,113 @@ class ModelLoader(BaseLoader):
                              f'Please choose between "bce" and "nll".')
         self._loss = value
 
+    @property
+    def jit_compile(self) -> Optional[bool]:
+        return self._jit_compile
+
+    @jit_compile.setter
+    def jit_compile(self, value: Optional[bool]):
+        if (value is None) and ('PAWS_JIT' in os.environ):
+            value = os.environ['PAWS_JIT'].lower() in ['1', 'true', 'yes', 'on']
+        self._jit_compile = None if value is None else bool(value)
+
+    @property
+    def precision(self) -> str:
+        return self._precision
+
+    @precision.setter
+    def precision(self, value: str):
+        value = value.lower()
+        if value not in ['float32', 'mixed_bf16']:
+            raise ValueError(f'Invalid model precision: {value}. '
+                             f'Please choose between "float32" and "mixed_bf16".')
+        if value == 'mixed_bf16':
+            from tensorflow.keras import mixed_precision
+            mixed_precision.set_global_policy('mixed_bfloat16')
+        elif 'tensorflow' in sys.modules:
+            # restore the default policy if mixed precision was enabled previously
+            from tensorflow.keras import mixed_precision
+            if mixed_precision.global_policy().name == 'mixed_bfloat16':
+                mixed_precision.set_global_policy('float32')
+        self._precision = value
+
+    @property
+    def dtype_policy(self) -> Optional[str]:
+        """Keras dtype policy applied to the loaded prior models (None for the default policy)."""
+        return 'mixed_bfloat16' if self.precision == 'mixed_bf16' else None
+
+    @property
+    def output_dtype(self) -> Optional[str]:
+        """Dtype of the output layers (kept in float32 under mixed precision)."""
+        return 'float32' if self.precision == 'mixed_bf16' else None
+
+    def _get_checkpoint_basename(self, name: str) -> str:
+        # partially formatted basenames only depend on the path manager setup
+        if name not in self._checkpoint_basenames:
+            if name in ['train_metrics', 'model_weights']:
+                basename = self.path_manager.get_directory(name, basename_only=True, partial_format=True)
+            else:
+                basename = self.path_manager.get_basename(name, partial_format=True)
+            self._checkpoint_basenames[name] = basename
+        return self._checkpoint_basenames[name]
+
+    def _get_semi_weakly_model_key(self, **kwargs) -> str:
+        # the initial parameter values do not change the model structure
+        key = {name: value for name, value in kwargs.items() if name not in SEMI_WEAKLY_PARAMETERS}
+        for name in ['fs_model_path', 'fs_model_path_2']:
+            paths = key[name]
+            if paths is None:
+                continue
+            paths = [paths] if isinstance(paths, str) else list(paths)
+            # retrained models are reloaded
+            key[name] = [(os.path.abspath(path), os.path.getmtime(path)) for path in paths]
+        # prior ratio networks used for inferred or sampled kappa values
+        if len(self.decay_modes) > 1:
+            kappa_2, kappa_3 = self._split_multi_signal_kappa(kwargs['kappa'])
+            kappa_sources = [(kappa_2, kwargs['fs_model_path']), (kappa_3, kwargs['fs_model_path_2'])]
+        else:
+            kappa_sources = [(kwargs['kappa'], kwargs['fs_model_path'])]
+        prior_ratio_paths = []
+        for val, supervised_model_path in kappa_sources:
+            if not isinstance(supervised_model_path, str):
+                continue
+            path = self._get_prior_ratio_model_path(val, supervised_model_path)
+            if path is not None:
+                mtime = os.path.getmtime(path) if os.path.exists(path) else None
+                prior_ratio_paths.append((path, mtime))
+        key['prior_ratio_model_path'] = prior_ratio_paths
+        # loader settings which define the model inputs
+        key['feature_level'] = self.feature_level.key
+        key['variables'] = self.variables
+        key['noise_dimension'] = self.noise_dimension
+        key['has_mu'] = kwargs['mu'] is not None
+        key['has_alpha'] = kwargs['alpha'] is not None
+        key['loss'] = self.loss
+        key['precision'] = self.precision
+        key['decay_modes'] = [str(decay_mode) for decay_mode in self.decay_modes]
+        return json.dumps(key, sort_keys=True, default=str)
+
+    def _warm_jit(self) -> None:
+        try:
+            from ._semiweakly_numeric import warmup
+            warmup()
+        except Exception as e:
+            self.stdout.debug(f'Failed to warm up the numba kernels: {e}')
+
+    def _use_jit_compile(self, model_type: Optional[Union[str, ModelType]] = None) -> bool:
+        if self.jit_compile is not None:
+            return self.jit_compile
+        # the semi-weakly layers are chains of small elementwise ops which benefit the most from fusion
+        return bool(model_type) and (ModelType.parse(model_type) == SEMI_WEAKLY)
+
+    def _in_strategy_scope(self) -> bool:
+        tf = _tf()
+        return tf.distribute.has_strategy() and (tf.distribute.get_strategy() is self.distribute_strategy)
+
     def _distributed_wrapper(self, fn, **kwargs):
-        if self.distribute_strategy:
+        # the strategy is shared by all model builds; avoid re-entering its scope
+        # when the models are built within an already active scope
+        if self.distribute_strategy and (not self._in_strategy_scope()):
             with self.distribute_strategy.scope():
                 result = fn(**kwargs)
         else:
@@ -128,11 +394,14 @@ class ModelLoader(BaseLoader):
             'part_masks': 'masks'
         }
 
-        tmp_metadata = feature_metadata.copy()
-        if downcast:
-            for metadata in tmp_metadata.values():
-                if metadata['dtype'] == 'float64':
-                    metadata['dtype'] = 'float32'
+        dtype_map = self._DOWNCAST_MAP if downcast else {}
+        tmp_metadata = {
+            feature: {**metadata, 'dtype': dtype_map.get(metadata['dtype'], metadata['dtype'])}
+            for feature, metadata in feature_metadata.items()
+        }
+        if (self.variables is not None) or self.noise_dimension_per_jet:
+            # copy the shape so that the input metadata is not modified
+            tmp_metadata['jet_features']['shape'] = list(tmp_metadata['jet_features']['shape'])
 
         if self.variables is not None:
             nvar = len(self.variables)
@@ -169,7 +438,8 @@ class ModelLoader(BaseLoader):
         epochs: Optional[int] = None,
         model_save_freq: str = 'epoch',
         metric_save_freq: str = 'epoch',
-        weight_save_freq: str = 'epoch'
+        weight_save_freq: str = 'epoch',
+        steps_per_execution: Optional[int] = None
     ):
         """
         Get the configuration for training.
@@ -182,6 +452,13 @@ class ModelLoader(BaseLoader):
             The type of model.
         weight_clipping : bool
             Whether to apply weight clipping.
+        steps_per_execution : (optional) int
+            Number of batches run within each call of the compiled train
+            function. Larger values amortize the per-step dispatch overhead,
+            which dominates for small models, at the cost of the metrics and
+            batch-level callbacks being updated only once every N batches.
+            By default, 64 is used for semi-weakly models when no batch-level
+            logging is requested, and 1 otherwise.
 
         Returns
         ----------------------------------------------------
@@ -194,6 +471,8 @@ class ModelLoader(BaseLoader):
                 'epochs': epochs or 3000,
                 'optimizer': 'Adam',
                 'optimizer_config': {'learning_rate': 0.001},
+                'jit_compile': self._use_jit_compile(model_type),
+                'steps_per_execution': steps_per_execution or 1,
                 'checkpoint_dir': checkpoint_dir,
                 'callbacks': {
                     'early_stopping': {
@@ -224,6 +503,8 @@ class ModelLoader(BaseLoader):
             'epochs': epochs,
             'optimizer': 'Adam',
             'optimizer_config': {'learning_rate': 0.01},
+            'jit_compile': self._use_jit_compile(model_type),
+            'steps_per_execution': steps_per_execution or 1,
             'checkpoint_dir': checkpoint_dir,
             'callbacks': {
                 'lr_scheduler': {
@@ -277,6 +558,13 @@ class ModelLoader(BaseLoader):
                 'min_lr': 1e-6,
                 'verbose': True
             }
+            if steps_per_execution is None:
+                save_freqs = [model_save_freq, metric_save_freq, weight_save_freq]
+                # batch-level logging needs the callbacks to be called after every batch
+                batch_logging = any((not isinstance(freq, str)) or
+                                    (LoggerSaveMode.parse(freq) == LoggerSaveMode.BATCH)
+                                    for freq in save_freqs)
+                config['steps_per_execution'] = 1 if batch_logging else 64
         return config
 
     def _print_config_summary(self, config):
@@ -316,7 +604,7 @@ class ModelLoader(BaseLoader):
         
     def _get_high_level_model(self, feature_metadata: Dict, parametric: bool = True):
         from tensorflow.keras import Model
-        from tensorflow.keras.layers import Dense
+        from tensorflow.keras.layers import Dense, Flatten
         import tensorflow as tf
 
         all_inputs = self.get_supervised_model_inputs(feature_metadata)
@@ -329,14 +617,16 @@ class ModelLoader(BaseLoader):
                                                                    
             x = tf.concat([x1, tf.expand_dims(x2, axis=-1)], -1)
                                 
-            x = tf.reshape(x, (-1, tf.reduce_prod(tf.shape(x)[1:])))
+            x = Flatten()(x)
         else:
             inputs = [x1]
-            x = tf.reshape(x1, (-1, tf.reduce_prod(tf.shape(x1)[1:])))
+            x = Flatten()(x1)
 
                                  
-        for nodes, activation in MLP_LAYERS:
+        for nodes, activation in MLP_LAYERS[:-1]:
             x = Dense(nodes, activation)(x)
+        nodes, activation = MLP_LAYERS[-1]
+        x = Dense(nodes, activation, dtype=self.output_dtype)(x)
         
         model = Model(inputs=inputs, outputs=x, name='HighLevel')
         
@@ -353,6 +643,12 @@ class ModelLoader(BaseLoader):
         inputs = {key: all_inputs[key] for key in keys}
         model_builder = MultiParticleNet()
         model = model_builder.get_model(**inputs)
+        if self.output_dtype is not None:
+            from tensorflow.keras import Model
+            from tensorflow.keras.layers import Activation
+            # keep the model output in float32 under mixed precision
+            outputs = Activation('linear', dtype=self.output_dtype)(model.output)
+            model = Model(inputs=model.inputs, outputs=outputs, name=model.name)
         return model
             
     def get_supervised_model(self, feature_metadata: Dict, parametric: bool):
@@ -421,10 +717,12 @@ class ModelLoader(BaseLoader):
             exp = tf.exp
 
         inputs = Input(shape=(1,))
+        # always keep the parameters in full precision
         outputs = Dense(1, use_bias=False, activation=activation,
                         kernel_initializer=kernel_initializer,
                         kernel_constraint=kernel_constraint,
                         kernel_regularizer=kernel_regularizer,
+                        dtype='float32',
                         name=name)(inputs)
         model = Model(inputs=inputs, outputs=outputs)
         if not trainable:
@@ -460,25 +758,25 @@ class ModelLoader(BaseLoader):
 
         regularizers = {}
         for parameter in ['m1', 'm2', 'mu', 'alpha']:
-            regularizers[parameter] = get_parameter_regularizer(parameter) if use_regularizer else None
+            regularizers[parameter] = _cached_regularizer(parameter, use_regularizer)
         weights = {
-            'm1': self.get_single_parameter_model(activation=get_parameter_transform('m1'),
+            'm1': self.get_single_parameter_model(activation=_cached_transform('m1'),
                                                   kernel_initializer=tf.constant_initializer(float(m1)),
                                                   kernel_regularizer=regularizers['m1'],
                                                   name='m1'),
-            'm2': self.get_single_parameter_model(activation=get_parameter_transform('m2'),
+            'm2': self.get_single_parameter_model(activation=_cached_transform('m2'),
                                                   kernel_initializer=tf.constant_initializer(float(m2)),
                                                   kernel_regularizer=regularizers['m2'],
                                                   name='m2')
         }
         if mu is not None:
-            weights['mu'] = self.get_single_parameter_model(activation=get_parameter_transform('mu'),
+            weights['mu'] = self.get_single_parameter_model(activation=_cached_transform('mu'),
                                                             kernel_initializer=tf.constant_initializer(float(mu)),
                                                             kernel_regularizer=regularizers['mu'],
                                                             name='mu')
             
         if alpha is not None:
-            weights['alpha'] = self.get_single_parameter_model(activation=get_parameter_transform('alpha'),
+            weights['alpha'] = self.get_single_parameter_model(activation=_cached_transform('alpha'),
                                                                kernel_initializer=tf.constant_initializer(float(alpha)),
                                                                kernel_regularizer=regularizers['alpha'],
                                                                name='alpha')
@@ -488,7 +786,12 @@ class ModelLoader(BaseLoader):
     def _get_one_signal_semi_weakly_layer(fs_out, mu,
                                           kappa: float = 1.,
                                           epsilon: float = 1e-10,
-                                          bug_fix: bool = True):
+                                          bug_fix: bool = True,
+                                          use_numpy: bool = False):
+        if use_numpy:
+            from ._semiweakly_numeric import ws_one_signal_np
+            return ws_one_signal_np(fs_out, mu, kappa=kappa, epsilon=epsilon, bug_fix=bug_fix)
+        fs_out, kappa = cast_float32(fs_out), cast_float32(kappa)
         LLR = kappa * fs_out / (1. - fs_out + epsilon)
         LLR_xs = 1. + mu * (LLR - 1.)
         if bug_fix:
@@ -502,7 +805,14 @@ class ModelLoader(BaseLoader):
                                           kappa_2: float = 1.,
                                           kappa_3: float = 1.,
                                           epsilon: float = 1e-10,
-                                          bug_fix: bool = True):
+                                          bug_fix: bool = True,
+                                          use_numpy: bool = False):
+        if use_numpy:
+            from ._semiweakly_numeric import ws_two_signal_np
+            return ws_two_signal_np(fs_2_out, fs_3_out, mu, alpha, kappa_2=kappa_2,
+                                    kappa_3=kappa_3, epsilon=epsilon, bug_fix=bug_fix)
+        fs_2_out, fs_3_out = cast_float32(fs_2_out), cast_float32(fs_3_out)
+        kappa_2, kappa_3 = cast_float32(kappa_2), cast_float32(kappa_3)
         LLR_2 = kappa_2 * fs_2_out / (1. - fs_2_out + epsilon)
         LLR_3 = kappa_3 * fs_3_out / (1. - fs_3_out + epsilon)
         LLR_xs = 1. + mu * (alpha * LLR_3 + (1 - alpha) * LLR_2 - 1.)
@@ -515,7 +825,12 @@ class ModelLoader(BaseLoader):
     @staticmethod
     def _get_one_signal_likelihood_layer(fs_out, mu,
                                          kappa: float = 1.,
-                                         epsilon: float = 1e-10):
+                                         epsilon: float = 1e-10,
+                                         use_numpy: bool = False):
+        if use_numpy:
+            from ._semiweakly_numeric import likelihood_one_signal_np
+            return likelihood_one_signal_np(fs_out, mu, kappa=kappa, epsilon=epsilon)
+        fs_out, kappa = cast_float32(fs_out), cast_float32(kappa)
         LLR = kappa * fs_out / (1. - fs_out + epsilon)
         LLR_xs = 1. + mu * (LLR - 1.)
         return LLR_xs  
@@ -524,7 +839,14 @@ class ModelLoader(BaseLoader):
     def _get_two_signal_likelihood_layer(fs_2_out, fs_3_out, mu, alpha,
                                          kappa_2: float = 1.,
                                          kappa_3: float = 1.,
-                                         epsilon: float = 1e-10):
+                                         epsilon: float = 1e-10,
+                                         use_numpy: bool = False):
+        if use_numpy:
+            from ._semiweakly_numeric import likelihood_two_signal_np
+            return likelihood_two_signal_np(fs_2_out, fs_3_out, mu, alpha, kappa_2=kappa_2,
+                                            kappa_3=kappa_3, epsilon=epsilon)
+        fs_2_out, fs_3_out = cast_float32(fs_2_out), cast_float32(fs_3_out)
+        kappa_2, kappa_3 = cast_float32(kappa_2), cast_float32(kappa_3)
         LLR_2 = kappa_2 * fs_2_out / (1. - fs_2_out + epsilon)
         LLR_3 = kappa_3 * fs_3_out / (1. - fs_3_out + epsilon)
         LLR_xs = 1. + mu * (alpha * LLR_3 + (1 - alpha) * LLR_2 - 1.)
@@ -541,11 +863,67 @@ class ModelLoader(BaseLoader):
             model_paths = [model_paths]
         prior_models = []
         for i, model_path in enumerate(model_paths):
-            prior_model = self.load_model(model_path)
+            prior_model = self._cached_load(model_path, dtype_policy=self.dtype_policy)
             self.freeze_all_layers(prior_model)
             prior_model._name = f"{name}_{i + 1}"
             prior_models.append(prior_model)
-        return Average()([prior_model(x) for prior_model in prior_models])
+        # frozen priors are always evaluated in inference mode
+        prior_outs = [prior_model(x, training=False) for prior_model in prior_models]
+        if len(prior_outs) == 1:
+            return prior_outs[0]
+        # keep the averaged prior output in float32 under mixed precision
+        return Average(dtype=self.output_dtype)(prior_outs)
+
+    def _get_prior_ratio_model_path(self, val: Union[str, float], supervised_model_path: str) -> Optional[str]:
+        # path to the prior ratio network evaluating kappa (None for a constant kappa)
+        if isinstance(val, Number):
+            return None
+        assert isinstance(val, str)
+        val = val.lower()
+        if val not in _KAPPA_SPECIAL:
+            return None
+        basename = self.path_manager.get_file("model_prior_ratio",
+                                              basename_only=True,
+                                              sampling_method=val)
+        dirname = os.path.dirname(supervised_model_path)
+        return os.path.abspath(os.path.join(dirname, basename))
+
+    @staticmethod
+    def _split_multi_signal_kappa(kappa: Union[str, float]) -> Tuple[Union[str, float], Union[str, float]]:
+        # kappa values of the two-prong and three-prong signals
+        if not isinstance(kappa, str):
+            return kappa, kappa
+        tokens = [token.strip() for token in kappa.split(',') if token.strip()]
+        if len(tokens) == 1:
+            return tokens[0], tokens[0]
+        if len(tokens) == 2:
+            return tuple(tokens)
+        raise ValueError(f'failed to interpret kappa value: {kappa}')
+
+    def _resolve_kappa(
+        self,
+        val: Union[str, float],
+        supervised_model_path: str,
+        mass_params,
+        name: Optional[str] = None,
+        cache: Optional[Dict[str, Any]] = None
+    ):
+        model_path = self._get_prior_ratio_model_path(val, supervised_model_path)
+        if model_path is None:
+            return float(val)
+        # the same prior ratio model only needs to be evaluated once per graph
+        if (cache is not None) and (model_path in cache):
+            return cache[model_path]
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f'prior ratio model path does not exist: {model_path}')
+        prior_model = self._cached_load(model_path)
+        if name is not None:
+            prior_model._name = name
+        self.freeze_all_layers(prior_model)
+        kappa_out = prior_model(mass_params)
+        if cache is not None:
+            cache[model_path] = kappa_out
+        return kappa_out
 
     def _get_semi_weakly_model(
         self,
@@ -576,11 +954,14 @@ class ModelLoader(BaseLoader):
             use_regularizer=use_regularizer
         )
         self.semi_weakly_weight_models = weights
-        m1_out = weights['m1'](ones_like(inputs['jet_features'])[:, 0, 0])
-        m2_out = weights['m2'](ones_like(inputs['jet_features'])[:, 0, 0])
-        mu_out = weights['mu'](ones_like(inputs['jet_features'])[:, 0, 0])
-        alpha_out = weights['alpha'](ones_like(inputs['jet_features'])[:, 0, 0])
-        mass_params = tf.keras.layers.concatenate([m1_out, m2_out])
+        # shared unit input for all the parameter models
+        ones_scalar = ones_like(inputs['jet_features'])[:, 0, 0]
+        m1_out = weights['m1'](ones_scalar)
+        m2_out = weights['m2'](ones_scalar)
+        mu_out = weights['mu'](ones_scalar)
+        alpha_out = weights['alpha'](ones_scalar)
+        # the parameter models are float32, keep the merged masses in float32 under mixed precision
+        mass_params = tf.keras.layers.Concatenate(dtype='float32')([m1_out, m2_out])
 
         train_features = self._get_train_features(SEMI_WEAKLY)
         train_inputs = [inputs[feature] for feature in train_features]
@@ -591,26 +972,7 @@ class ModelLoader(BaseLoader):
         if multi_signal and fs_model_path_2 is None:
             raise ValueError('fs_model_path_2 cannot be None when multiple signals are considered')
 
-        def get_kappa_out(val: Union[str, float], supervised_model_path: str, name: Optional[str] = None):
-            if isinstance(val, Number):
-                return float(val)
-            assert isinstance(val, str)
-            val = val.lower()
-            if val in ['inferred', 'sampled']:
-                basename = self.path_manager.get_file("model_prior_ratio",
-                                                      basename_only=True,
-                                                      sampling_method=val)
-                dirname = os.path.dirname(supervised_model_path)
-                model_path = os.path.join(dirname, basename)
-                if not os.path.exists(model_path):
-                    raise FileNotFoundError(f'prior ratio model path does not exist: {model_path}')
-                prior_model = self.load_model(model_path)
-                if name is not None:
-                    prior_model._name = name
-                self.freeze_all_layers(prior_model)
-                return prior_model(mass_params)
-            return float(val)
-            
+        kappa_cache = {}
 
         if not multi_signal:
             fs_out = self._get_prior_out(
@@ -618,7 +980,7 @@ class ModelLoader(BaseLoader):
                 fs_model_path,
                 name='prior'
             )
-            kappa_out = get_kappa_out(kappa, fs_model_path)
+            kappa_out = self._resolve_kappa(kappa, fs_model_path, mass_params, cache=kappa_cache)
             if self.loss != 'nll':
                 ws_out = self._get_one_signal_semi_weakly_layer(fs_out, mu=mu_out, kappa=kappa_out,
                                                                 epsilon=epsilon, bug_fix=bug_fix)
@@ -629,18 +991,11 @@ class ModelLoader(BaseLoader):
             self.llr_model = tf.keras.Model(inputs=train_inputs, outputs=LLR, name='LLR')
             self.fs_model = tf.keras.Model(inputs=train_inputs, outputs=fs_out, name='Supervised')
         else:
-            if isinstance(kappa, str):
-                tokens = split_str(kappa, sep=',', remove_empty=True)
-                if len(tokens) == 1:
-                    kappa_2, kappa_3 = tokens[0], tokens[0]
-                elif len(tokens) == 2:
-                    kappa_2, kappa_3 = tokens
-                else:
-                    raise ValueError(f'failed to interpret kappa value: {kappa}')
-            else:
-                kappa_2, kappa_3 = kappa, kappa
-            kappa_2_out = get_kappa_out(kappa_2, fs_model_path, "PriorRatioNet_2")
-            kappa_3_out = get_kappa_out(kappa_3, fs_model_path_2, "PriorRatioNet_3")
+            kappa_2, kappa_3 = self._split_multi_signal_kappa(kappa)
+            kappa_2_out = self._resolve_kappa(kappa_2, fs_model_path, mass_params,
+                                              name="PriorRatioNet_2", cache=kappa_cache)
+            kappa_3_out = self._resolve_kappa(kappa_3, fs_model_path_2, mass_params,
+                                              name="PriorRatioNet_3", cache=kappa_cache)
             fs_2_out = self._get_prior_out(
                 fs_inputs,
                 fs_model_path,
@@ -660,17 +1015,31 @@ class ModelLoader(BaseLoader):
                 ws_out = self._get_two_signal_likelihood_layer(fs_2_out, fs_3_out, mu=mu_out,
                                                                alpha=alpha_out, epsilon=epsilon,
                                                                kappa_2=kappa_2_out, kappa_3=kappa_3_out)
-            LLR_2 = kappa_out * fs_2_out / (1 - fs_2_out + 1e-10)
-            LLR_3 = kappa_out * fs_3_out / (1 - fs_3_out + 1e-10)
+            LLR_2 = kappa_2_out * fs_2_out / (1 - fs_2_out + 1e-10)
+            LLR_3 = kappa_3_out * fs_3_out / (1 - fs_3_out + 1e-10)
             self.llr_2_model = tf.keras.Model(inputs=train_inputs, outputs=LLR_2, name='TwoProngLLR')
             self.llr_3_model = tf.keras.Model(inputs=train_inputs, outputs=LLR_3, name='ThreeProngLLR')
             self.fs_2_model = tf.keras.Model(inputs=train_inputs, outputs=fs_2_out, name='TwoProngSupervised')
             self.fs_3_model = tf.keras.Model(inputs=train_inputs, outputs=fs_3_out, name='ThreeProngSupervised')
 
         ws_model = tf.keras.Model(inputs=train_inputs, outputs=ws_out, name='SemiWeakly')
+        self._index_semi_weakly_weights(ws_model)
+        if self.precision == 'mixed_bf16':
+            fs_models = [self.fs_model] if not multi_signal else [self.fs_2_model, self.fs_3_model]
+            self._check_float32_outputs([ws_model] + fs_models)
         
         return ws_model
 
+    @staticmethod
+    def _check_float32_outputs(models: List["keras.Model"]) -> None:
+        # a bfloat16 prior output rounds values close to 1 to exactly 1 and the LLR diverges
+        tf = _tf()
+        for model in models:
+            dtype = tf.as_dtype(model.output.dtype)
+            if dtype != tf.float32:
+                raise RuntimeError(f'Output of the model "{model.name}" is in {dtype.name} precision, '
+                                   f'expected float32.')
+
     def get_prior_ratio_model(self, feature_metadata: Dict) -> "keras.Model":
         return self._get_prior_ratio_model(feature_metadata)
 
@@ -682,7 +1051,8 @@ class ModelLoader(BaseLoader):
                               epsilon: float = 1e-5,
                               bug_fix: bool = True,
                               use_sigmoid: bool = False,
-                              use_regularizer: bool = True) -> "keras.Model":
+                              use_regularizer: bool = True,
+                              cache: bool = False) -> "keras.Model":
         """
         Get the semi-weakly model.
 
@@ -708,6 +1078,12 @@ class ModelLoader(BaseLoader):
             both 2-prong and 3-prong signals are used.
         epsilon : float, default 1e-5.
             Small constant added to the model to avoid division by zero.
+        cache : bool, default False
+            Whether to reuse a previously built model with the same
+            configuration (e.g. across the trials of a scan). On a cache hit,
+            the weights of the cached model are reset to the given initial
+            values. Compile the model with `compile_model(..., reuse=True)`
+            to reset the optimizer state without retracing the model.
 
         Returns
         ----------------------------------------------------
@@ -728,8 +1104,51 @@ class ModelLoader(BaseLoader):
             'use_sigmoid': use_sigmoid,
             'use_regularizer': use_regularizer
         }
+        if cache:
+            key = self._get_semi_weakly_model_key(**kwargs)
+            if key in self._sw_model_cache:
+                model, auxiliary_models = self._sw_model_cache[key]
+                # restore the sub-models of the cached model
+                for name, auxiliary_model in auxiliary_models.items():
+                    setattr(self, name, auxiliary_model)
+                self.reset_semi_weakly_weights(model, m1=m1, m2=m2, mu=mu, alpha=alpha)
+                return model
+            previous_models = {name: getattr(self, name, None) for name in _SW_AUXILIARY_MODELS}
         model_fn = self._get_semi_weakly_model
-        return self._distributed_wrapper(model_fn, **kwargs)
+        model = self._distributed_wrapper(model_fn, **kwargs)
+        if cache:
+            # only keep the sub-models created by this build
+            auxiliary_models = {name: getattr(self, name) for name in _SW_AUXILIARY_MODELS
+                                if getattr(self, name, None) is not previous_models[name]}
+            self._sw_model_cache[key] = (model, auxiliary_models)
+        return model
+
+    @staticmethod
+    def reset_semi_weakly_weights(ws_model, m1: float, m2: float,
+                                  mu: Optional[float] = None,
+                                  alpha: Optional[float] = None) -> None:
+        """
+        Reset the weights of a semi-weakly model to the given initial values
+        (as used to construct the model), e.g. to reuse the model in a new trial.
+
+        Parameters
+        ----------------------------------------------------
+        ws_model: Keras model
+            The semi-weakly model.
+        m1 : float
+            Initial value of the first mass parameter (mX).
+        m2 : float
+            Initial value of the second mass parameter (mY).
+        mu : (optional) float
+            Initial value of the signal fraction parameter.
+        alpha : (optional) float
+            Initial value of the branching fraction parameter.
+        """
+        ModelLoader.set_semi_weakly_model_weights(ws_model, m1=m1, m2=m2, mu=mu, alpha=alpha)
+
+    def clear_semi_weakly_model_cache(self) -> None:
+        """Clear the cache of semi-weakly models."""
+        self._sw_model_cache.clear()
 
     @staticmethod
     def set_semi_weakly_model_weights(ws_model, m1: Optional[float] = None,
@@ -752,21 +1171,38 @@ class ModelLoader(BaseLoader):
         alpha : (optional) float
             Value of the branching fraction parameter.
         """
-        weight_dict = {
-            'm1/kernel:0': m1,
-            'm2/kernel:0': m2,
-            'mu/kernel:0': mu,
-            'alpha/kernel:0': alpha
-        }
-        for weight in ws_model.trainable_weights:
-            name = weight.name
-            if name not in weight_dict:
-                raise RuntimeError(f'Unknown model weight: {name}. Please make sure model weights are initialized with the proper names')
-                                                                                 
-                                                  
-            value = weight_dict[name]
-            if value is not None:
-                assign_weight(weight, value)
+        _, _, parameter_slots = ModelLoader._index_semi_weakly_weights(ws_model)
+        # values follow the order of SEMI_WEAKLY_PARAMETERS
+        values = (m1, m2, mu, alpha)
+        pairs = [(weight, value) for weight, value in zip(parameter_slots, values)
+                 if (weight is not None) and (value is not None)]
+        batch_assign_weights(pairs)
+
+    @staticmethod
+    def _index_semi_weakly_weights(ws_model) -> Tuple[Tuple[str, ...], Tuple["tf.Variable", ...],
+                                                      Tuple[Optional["tf.Variable"], ...]]:
+        """
+        Get the pre-indexed trainable weights of a semi-weakly model as a tuple of
+        (names, weights, parameter slots), where the parameter slots hold the weight
+        of each parameter in the order of SEMI_WEAKLY_PARAMETERS (None if the model
+        does not have the parameter). The slots are computed once per model so that
+        the weight names are not parsed at call time.
+        """
+        slots = _SW_WEIGHT_SLOTS.get(ws_model, None)
+        if slots is not None:
+            return slots
+        weights = tuple(ws_model.trainable_weights)
+        names = tuple(weight.name.split('/')[0] for weight in weights)
+        for name, weight in zip(names, weights):
+            if name not in SEMI_WEAKLY_PARAMETERS:
+                raise RuntimeError(f'Unknown model weight: {weight.name}. Please make sure model weights are initialized with the proper names')
+        if len(set(names)) != len(names):
+            raise RuntimeError(f'Duplicated semi-weakly model weights: {names}')
+        weight_map = dict(zip(names, weights))
+        parameter_slots = tuple(weight_map.get(parameter, None) for parameter in SEMI_WEAKLY_PARAMETERS)
+        slots = (names, weights, parameter_slots)
+        _SW_WEIGHT_SLOTS[ws_model] = slots
+        return slots
 
     @staticmethod
     def get_semi_weakly_model_weights(ws_model) -> Dict:
@@ -783,12 +1219,19 @@ class ModelLoader(BaseLoader):
         weights: dictionary
             A dictionary of weights.
         """
-        weights = {}
-        for weight in ws_model.trainable_weights:
-            name = weight.name.split('/')[0]
-            value = weight.value().numpy().flatten()[0]
-            weights[name] = value
-        return weights
+        names, weights, _ = ModelLoader._index_semi_weakly_weights(ws_model)
+        reader = _SW_WEIGHT_READERS.get(ws_model, None)
+        if reader is None:
+            tf = _tf()
+            # read all the parameters with a single device to host transfer
+            read_fn = tf.function(lambda: tf.concat([tf.reshape(weight, [-1]) for weight in weights], axis=0))
+            # position of the first element of each weight in the concatenated values
+            offsets = np.cumsum([0] + [int(np.prod(weight.shape)) for weight in weights[:-1]])
+            reader = (read_fn, offsets)
+            _SW_WEIGHT_READERS[ws_model] = reader
+        read_fn, offsets = reader
+        values = read_fn().numpy()[offsets]
+        return dict(zip(names, values))
 
     @staticmethod
     def set_model_weights(model, values: Dict) -> None:
@@ -802,20 +1245,23 @@ class ModelLoader(BaseLoader):
         values : dict
             A dictionary mapping the weight name to the weight values.
         """
-        weights = model.trainable_weights
-                               
+        slots = _SW_WEIGHT_SLOTS.get(model, None)
+        if slots is not None:
+            names, weights, _ = slots
+        else:
+            weights = model.trainable_weights
+            names = None
         if isinstance(values, dict):
-            for weight in weights:
-                name = weight.name.split('/')[0]
-                if name in values:
-                    value = values[name]
-                    assign_weight(weight, value)
+            if names is None:
+                names = [weight.name.split('/')[0] for weight in weights]
+            pairs = [(weight, values[name]) for name, weight in zip(names, weights)
+                     if name in values]
         else:
-            for i, value in enumerate(values):
-                assign_weight(weights[i], value)
+            pairs = [(weights[i], value) for i, value in enumerate(values)]
+        batch_assign_weights(pairs)
 
     @staticmethod
-    def compile_model(model, config: Dict) -> None:
+    def compile_model(model, config: Dict, reuse: bool = False) -> None:
         """
         Compile the model with the given configuration.
 
@@ -825,14 +1271,61 @@ class ModelLoader(BaseLoader):
             The model to compile.
         config : dictionary
             A dictionary containing the configuration for compiling the model.
+            If "jit_compile" is enabled, the train, test and predict steps of
+            the model are compiled with XLA. If "steps_per_execution" is
+            greater than 1, the given number of batches are run within each
+            call of the compiled functions.
+        reuse : bool, default False
+            Whether to reuse the compiled functions of a model which was
+            already compiled with the same configuration (e.g. a cached
+            semi-weakly model). In that case, the optimizer state and the
+            metrics are reset instead of compiling the model again, which
+            avoids retracing (and recompiling with XLA) the train function.
         """
-        import tensorflow as tf
-        optimizer = getattr(tf.keras.optimizers, config['optimizer'])(**config['optimizer_config'])
-        metrics = config['metrics'] if 'metrics' in config else None
-        model.compile(loss=config['loss'], optimizer=optimizer, metrics=metrics)
+        tf = _tf()
+        compile_config = _serialize_compile_config(config)
+        if (reuse and (config['optimizer'] in _ZERO_STATE_OPTIMIZERS) and
+            (_COMPILED_CONFIGS.get(model, None) == compile_config)):
+            ModelLoader.reset_compiled_model(model, learning_rate=config['optimizer_config'].get('learning_rate', None))
+            return
+        optimizer_config = dict(config['optimizer_config'])
+        optimizer = _optimizer_cls(config['optimizer'])(**optimizer_config)
+        metrics = config.get('metrics', None)
+        # XLA is slower than the default kernels in double precision
+        jit_compile = config.get('jit_compile', False) and (tf.keras.backend.floatx() != 'float64')
+        steps_per_execution = config.get('steps_per_execution', 1)
+        model.compile(loss=config['loss'], optimizer=optimizer, metrics=metrics,
+                      jit_compile=jit_compile, steps_per_execution=steps_per_execution)
+        _COMPILED_CONFIGS[model] = compile_config
 
     @staticmethod
-    def load_model(model_path: str) -> "keras.Model":
+    def reset_compiled_model(model, learning_rate: Optional[float] = None) -> None:
+        """
+        Reset the optimizer state and the metrics of a compiled model while
+        keeping its compiled train, test and predict functions.
+
+        The optimizer variables (iterations and slot variables) are reset to
+        zero, which is their initial value for the Adam, SGD and RMSprop
+        optimizers.
+
+        Parameters
+        ----------------------------------------------------
+        model : Keras model
+            The compiled model.
+        learning_rate : float, optional
+            Learning rate to restore (e.g. after a decay by a scheduler).
+        """
+        optimizer = model.optimizer
+        # tensorflow variables have a tf.DType while keras 3 variables have a string dtype
+        pairs = [(variable, np.zeros(variable.shape, dtype=getattr(variable.dtype, 'as_numpy_dtype', variable.dtype)))
+                 for variable in optimizer.variables]
+        batch_assign_weights(pairs)
+        if learning_rate is not None:
+            optimizer.learning_rate = learning_rate
+        model.reset_metrics()
+
+    @staticmethod
+    def load_model(model_path: str, inference_only: bool = False) -> "keras.Model":
         """
         Load a tensorflow keras model from the specified path.
 
@@ -840,28 +1333,70 @@ class ModelLoader(BaseLoader):
         ----------------------------------------------------
         model_path : str
             Path to the model.
+        inference_only : bool, default False
+            Whether the model is only used for inference. If True, the
+            optimizer, loss and metrics of the saved model are not restored,
+            and the model needs to be compiled again before training or
+            evaluation.
 
         Returns
         ----------------------------------------------------
         Model : Keras model
             Loaded model.
         """
-        from aliad.interface.keras import load_model
+        if inference_only:
+            _lazy_import('aliad.interface.keras', 'load_custom_objects')()
+            return _tf().keras.models.load_model(model_path, compile=False)
+        load_model = _lazy_import('aliad.interface.keras', 'load_model')
         model = load_model(model_path)
         return model
 
+    @staticmethod
+    def _cached_load(model_path: str, dtype_policy: Optional[str] = None) -> "keras.Model":
+        """
+        Load a tensorflow keras model from the specified path, reusing a
+        previously loaded copy of the same (unmodified) file if available.
+
+        A fresh clone of the cached model is returned so that the caller
+        can rename or freeze it without affecting other instances.
+
+        Parameters
+        ----------------------------------------------------
+        model_path : str
+            Path to the model.
+        dtype_policy : str, optional
+            Keras dtype policy (e.g. "mixed_bfloat16") of the cloned layers.
+            The output layers are kept in float32. By default, the dtypes of
+            the saved model are used.
+
+        Returns
+        ----------------------------------------------------
+        Model : Keras model
+            Loaded model.
+        """
+        model_path = os.path.abspath(model_path)
+        cached_model = _load_model_cached(model_path, os.path.getmtime(model_path))
+        clone_function = None
+        if dtype_policy is not None:
+            clone_function = _get_dtype_clone_function(dtype_policy, cached_model.output_names)
+        model = _tf().keras.models.clone_model(cached_model, clone_function=clone_function)
+        model.set_weights(cached_model.get_weights())
+        return model
+
     @staticmethod
     def freeze_all_layers(model) -> None:
         """
         Freeze all layers of the model.
 
+        This is an alias of `freeze_model` kept for backward compatibility:
+        setting the model as non-trainable recursively freezes all its layers.
+
         Parameters
         ----------------------------------------------------
         model : Keras model
             The model whose layers to freeze.
         """
-        for layer in model.layers:
-            layer.trainable = False
+        ModelLoader.freeze_model(model)
 
     @staticmethod
     def freeze_model(model) -> None:
@@ -875,6 +1410,32 @@ class ModelLoader(BaseLoader):
         """
         model.trainable = False    
 
+    def _get_early_stopping_callback(self, config: Dict, checkpoint_dir: str):
+        EarlyStopping = _lazy_import('aliad.interface.tensorflow.callbacks', 'EarlyStopping')
+        return EarlyStopping(**config)
+
+    def _get_model_checkpoint_callback(self, config: Dict, checkpoint_dir: str):
+        BufferedModelCheckpoint = _lazy_import('paws.callbacks', 'BufferedModelCheckpoint')
+        basename = self._get_checkpoint_basename('model_checkpoint')
+        model_ckpt_filepath = os.path.join(checkpoint_dir, basename)
+        return BufferedModelCheckpoint(model_ckpt_filepath, **config)
+
+    def _get_metrics_logger_callback(self, config: Dict, checkpoint_dir: str):
+        MetricsLogger = _lazy_import('aliad.interface.tensorflow.callbacks', 'MetricsLogger')
+        basename = self._get_checkpoint_basename('train_metrics')
+        metrics_cachedir = os.path.join(checkpoint_dir, basename)
+        return MetricsLogger(metrics_cachedir, **config)
+
+    def _get_lr_scheduler_callback(self, config: Dict, checkpoint_dir: str):
+        LearningRateScheduler = _lazy_import('aliad.interface.tensorflow.callbacks', 'LearningRateScheduler')
+        return LearningRateScheduler(**config)
+
+    def _get_weights_logger_callback(self, config: Dict, checkpoint_dir: str):
+        BufferedWeightsLogger = _lazy_import('paws.callbacks', 'BufferedWeightsLogger')
+        basename = self._get_checkpoint_basename('model_weights')
+        weights_cachedir = os.path.join(checkpoint_dir, basename)
+        return BufferedWeightsLogger(weights_cachedir, **config)
+
     def get_callbacks(
         self,
         model_type: Union[str, ModelType],
@@ -896,38 +1457,17 @@ class ModelLoader(BaseLoader):
         callbacks : Dict
             Dictionary of callbacks.
         """
-        from aliad.interface.tensorflow.callbacks import LearningRateScheduler, MetricsLogger, WeightsLogger, EarlyStopping
-                                                                                       
-        from tensorflow.keras.callbacks import ModelCheckpoint
-        
         checkpoint_dir = config['checkpoint_dir']
 
-        callbacks = {}
-
-        targets = list(targets) if targets is not None else list(config['callbacks'])
-        if 'early_stopping' in targets:
-            callbacks['early_stopping'] = EarlyStopping(**config['callbacks']['early_stopping'])
-
-        if 'model_checkpoint' in targets:
-            basename = self.path_manager.get_basename('model_checkpoint', partial_format=True)
-            model_ckpt_filepath = os.path.join(checkpoint_dir, basename)
-            callbacks['model_checkpoint'] = ModelCheckpoint(model_ckpt_filepath, **config['callbacks']['model_checkpoint'])
-            
-        if 'metrics_logger' in targets:
-            basename = self.path_manager.get_directory('train_metrics', basename_only=True, partial_format=True)
-            metrics_cachedir = os.path.join(checkpoint_dir, basename)
-            callbacks['metrics_logger'] = MetricsLogger(metrics_cachedir, **config['callbacks']['metrics_logger'])
-
-        if 'lr_scheduler' in targets:
-            lr_scheduler = LearningRateScheduler(**config['callbacks']['lr_scheduler'])
-            callbacks['lr_scheduler'] = lr_scheduler
-
+        targets = frozenset(targets) if targets is not None else frozenset(config['callbacks'])
         model_type = ModelType.parse(model_type)
-        if (model_type == SEMI_WEAKLY) and ('weights_logger' in targets):
-            basename = self.path_manager.get_directory('model_weights', basename_only=True, partial_format=True)
-            weights_cachedir = os.path.join(checkpoint_dir, basename)
-            weights_logger = WeightsLogger(weights_cachedir, **config['callbacks']['weights_logger'])
-            callbacks['weights_logger'] = weights_logger
+        callbacks = {}
+        for name, builder in self._callback_builders.items():
+            if name not in targets:
+                continue
+            if (name == 'weights_logger') and (model_type != SEMI_WEAKLY):
+                continue
+            callbacks[name] = builder(config['callbacks'][name], checkpoint_dir)
 
         return callbacks
 
@@ -945,9 +1485,9 @@ class ModelLoader(BaseLoader):
         checkpoint_dir : str 
             Directory for checkpoints.
         """
-        basename = self.path_manager.get_basename("metrics_checkpoint", partial_format=True)
+        basename = self._get_checkpoint_basename("metrics_checkpoint")
         metrics_ckpt_filepath = os.path.join(checkpoint_dir, basename)
-        basename = self.path_manager.get_basename("model_checkpoint", partial_format=True)
+        basename = self._get_checkpoint_basename("model_checkpoint")
         model_ckpt_filepath = os.path.join(checkpoint_dir, basename)
         early_stopping.restore(model, metrics_ckpt_filepath=metrics_ckpt_filepath,
                                model_ckpt_filepath=model_ckpt_filepath)
\ No newline at end of file
@@ -212,7 +212,27 @@ class ModelTrainer(AbstractObject):
             pass
 
     def get_default_distribute_strategy(self, **kwargs) -> "tf.distribute.Strategy":
+        """
+        Get the default strategy for distributed training.
+
+        A synchronous MirroredStrategy is used, with NCCL all-reduce across
+        the devices when more than one GPU is available. Note that
+        ParameterServerStrategy should not be used for single-node multi-GPU
+        training as the parameter fetches and updates become the bottleneck.
+
+        Parameters
+        ----------------------------------------------------
+        **kwargs
+            Additional arguments for tf.distribute.MirroredStrategy.
+
+        Returns
+        ----------------------------------------------------
+        tf.distribute.Strategy
+            The distribute strategy.
+        """
         import tensorflow as tf
+        if ('cross_device_ops' not in kwargs) and (len(tf.config.list_physical_devices('GPU')) > 1):
+            kwargs['cross_device_ops'] = tf.distribute.NcclAllReduce()
         strategy = tf.distribute.MirroredStrategy(**kwargs)
         self.stdout.info("Created MirroredStrategy for distributed training")
         self.stdout.info(f"Number of devices : {strategy.num_replicas_in_sync}")
@@ -413,7 +433,9 @@ class ModelTrainer(AbstractObject):
                 fs_model_path_2=self.model_options['fs_model_path_2'],
                 kappa=self.model_options['kappa'],
                 use_sigmoid=self.model_options['use_sigmoid'],
-                use_regularizer=self.model_options['use_regularizer']
+                use_regularizer=self.model_options['use_regularizer'],
+                # the same model is reused across trials
+                cache=True
             )            
             # set to correct initial weight first and change later
             true_values = {
@@ -553,7 +575,7 @@ class ModelTrainer(AbstractObject):
             supervised_model_path = os.path.join(checkpoint_dir, basename)
             if not os.path.exists(supervised_model_path):
                 raise FileNotFoundError(f'Parametersed model file does not exist: {supervised_model_path}')
-            supervised_model = self.model_loader.load_model(supervised_model_path)
+            supervised_model = self.model_loader.load_model(supervised_model_path, inference_only=True)
             datasets = self.get_datasets()
             landscape = MetricLandscape()
             if param_expr is None:
@@ -761,7 +783,8 @@ class ModelTrainer(AbstractObject):
             early_stopping = callbacks_map.get('early_stopping', None)
             callbacks = list(callbacks_map.values())
 
-            self.model_loader.compile_model(model, train_config)
+            # cached semi-weakly models keep their compiled functions across trials
+            self.model_loader.compile_model(model, train_config, reuse=(self.model_type == SEMI_WEAKLY))
             
             if self.model_type == SEMI_WEAKLY:
                 init_m1, init_m2, init_mu = random_masses[trial][0], random_masses[trial][1], INIT_MU